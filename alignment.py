@@ -0,0 +1,155 @@
+import numpy as np
+
+MARKER_STREAM_TYPE = 'Markers'
+
+
+def find_stream(streams, stream_type):
+    """
+    Find the first stream of a given type in a list of XDF streams.
+
+    Args:
+    streams (list): Streams as returned by pyxdf.load_xdf
+    stream_type (str): LSL stream type, e.g. 'EEG' or 'Markers'
+
+    Returns:
+    dict: The matching stream, or None if there is none
+    """
+    for stream in streams:
+        if stream['info']['type'][0] == stream_type:
+            return stream
+    return None
+
+
+def fit_sample_clock(time_stamps):
+    """
+    Fit the actual sample clock of a recording from its timestamps.
+
+    A least-squares line is fitted through (sample index, timestamp) in a single
+    vectorized pass, so per-sample jitter averages out instead of shifting the time axis.
+
+    Args:
+    time_stamps (np.ndarray): Timestamp of each sample in seconds
+
+    Returns:
+    tuple: (time of the first sample, effective sampling rate in Hz)
+    """
+    time_stamps = np.asarray(time_stamps, dtype=float)
+    n_samples = time_stamps.shape[0]
+    if n_samples < 2:
+        raise ValueError("At least two timestamps are needed to fit a sample clock.")
+
+    index = np.arange(n_samples, dtype=float)
+    index_mean = index.mean()
+    time_mean = time_stamps.mean()
+    index_centered = index - index_mean
+    period = np.dot(index_centered, time_stamps - time_mean) / np.dot(index_centered, index_centered)
+    t0 = time_mean - period * index_mean
+    return t0, 1.0 / period
+
+
+def find_gaps(time_stamps, sampling_rate, tolerance=1.5):
+    """
+    Find dropped-sample gaps in a recording.
+
+    Args:
+    time_stamps (np.ndarray): Timestamp of each sample in seconds
+    sampling_rate (float): Expected sampling rate in Hz
+    tolerance (float): Gap threshold as a multiple of the sample period
+
+    Returns:
+    np.ndarray: Indices of the samples that directly follow a gap
+    """
+    intervals = np.diff(np.asarray(time_stamps, dtype=float))
+    return np.flatnonzero(intervals > tolerance / sampling_rate) + 1
+
+
+def resample_to_clock(data, time_stamps, sampling_rate=None):
+    """
+    Resample irregularly timed samples onto a uniform time grid.
+
+    All channels are linearly interpolated at once, which removes timestamp
+    jitter and fills dropped-sample gaps before any filtering is applied.
+
+    Args:
+    data (np.ndarray): Samples with shape (n_samples, n_channels)
+    time_stamps (np.ndarray): Timestamp of each sample in seconds
+    sampling_rate (float): Rate of the output grid in Hz; the fitted clock is used if None
+
+    Returns:
+    tuple: (uniform timestamps, resampled data with shape (n_grid, n_channels))
+    """
+    data = np.asarray(data, dtype=float)
+    time_stamps = np.asarray(time_stamps, dtype=float)
+    if sampling_rate is None:
+        _, sampling_rate = fit_sample_clock(time_stamps)
+
+    n_grid = int(np.floor((time_stamps[-1] - time_stamps[0]) * sampling_rate)) + 1
+    grid = time_stamps[0] + np.arange(n_grid) / sampling_rate
+
+    # Locate each grid point between two recorded samples and blend them
+    upper = np.clip(np.searchsorted(time_stamps, grid, side='right'), 1, len(time_stamps) - 1)
+    lower = upper - 1
+    span = time_stamps[upper] - time_stamps[lower]
+    weight = np.divide(grid - time_stamps[lower], span, out=np.zeros_like(grid), where=span > 0)
+    weight = np.clip(weight, 0.0, 1.0)
+    if data.ndim > 1:
+        weight = weight[:, np.newaxis]
+
+    resampled = data[lower] * (1.0 - weight) + data[upper] * weight
+    return grid, resampled
+
+
+def find_marker_times(marker_stream, label):
+    """
+    Get the timestamps of all markers with a given label.
+
+    Args:
+    marker_stream (dict): XDF marker stream
+    label (str): Marker label to look for, e.g. 'music start'
+
+    Returns:
+    np.ndarray: Timestamps of the matching markers in seconds
+    """
+    labels = np.array([marker[0] for marker in marker_stream['time_series']])
+    return np.asarray(marker_stream['time_stamps'], dtype=float)[labels == label]
+
+
+def find_event_indices(time_stamps, event_times):
+    """
+    Find the sample index of each event by binary search on sorted timestamps.
+
+    Args:
+    time_stamps (np.ndarray): Sorted timestamp of each sample in seconds
+    event_times (np.ndarray): Event times in seconds
+
+    Returns:
+    np.ndarray: Index of the first sample at or after each event
+    """
+    return np.searchsorted(time_stamps, event_times, side='left')
+
+
+def extract_epochs(data, event_indices, n_before, n_after):
+    """
+    Cut epochs around events without copying the underlying samples.
+
+    Each epoch is a view into data, so long recordings are never duplicated.
+    Epochs that would run past either end of the recording are skipped.
+
+    Args:
+    data (np.ndarray): Samples with shape (n_samples, ...)
+    event_indices (np.ndarray): Sample index of each event
+    n_before (int): Number of samples to keep before each event
+    n_after (int): Number of samples to keep from each event onwards
+
+    Returns:
+    list: Epoch views, each with shape (n_before + n_after, ...)
+    """
+    n_samples = data.shape[0]
+    epochs = []
+    for index in event_indices:
+        start = index - n_before
+        stop = index + n_after
+        if start >= 0 and stop <= n_samples:
+            epochs.append(data[start:stop])
+    return epochs
+
@@ -3,6 +3,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import butter, filtfilt, detrend
 from scipy.stats import ttest_ind
+from alignment import (MARKER_STREAM_TYPE, find_stream, find_gaps, resample_to_clock, find_marker_times,
+                       find_event_indices, extract_epochs)
+
+MARKER_LABEL = 'music start'
+MAX_GAP_SECONDS = 0.5  # Longer dropouts can't be bridged by interpolation without inventing signal
 
 
 # Define band-pass filter
@@ -23,18 +28,41 @@ def bandpass_filter(data, lowcut, highcut, fs, order=5):
 # Load and preprocess data for both participants
 def load_and_preprocess(xdf_file_path):
     streams, header = pyxdf.load_xdf(xdf_file_path)
-    eeg_stream = streams[0]
-    eeg_data = eeg_stream['time_series']
+    eeg_stream = find_stream(streams, 'EEG') or streams[0]
     sampling_rate = float(eeg_stream['info']['nominal_srate'][0])
 
+    # Interpolation fills dropped samples with a straight line, so only accept short gaps
+    raw_time_stamps = np.asarray(eeg_stream['time_stamps'], dtype=float)
+    gaps = find_gaps(raw_time_stamps, sampling_rate)
+    if len(gaps):
+        gap_durations = raw_time_stamps[gaps] - raw_time_stamps[gaps - 1]
+        print(f"{xdf_file_path}: {len(gaps)} gaps in the EEG stream, longest {gap_durations.max():.3f} s")
+        if gap_durations.max() > MAX_GAP_SECONDS:
+            raise ValueError(f"{xdf_file_path} has a gap of {gap_durations.max():.3f} s, "
+                             f"longer than the {MAX_GAP_SECONDS} s that can be interpolated.")
+
+    # Put the samples on a uniform clock so jitter and dropped samples don't skew the filters
+    eeg_data = np.nan_to_num(eeg_stream['time_series'], nan=0.0, posinf=0.0, neginf=0.0)
+    time_stamps, eeg_data = resample_to_clock(eeg_data, raw_time_stamps, sampling_rate)
+
+    # Analyse from the music start marker if the recording has one
+    onset = time_stamps[0]
+    marker_stream = find_stream(streams, MARKER_STREAM_TYPE)
+    if marker_stream is not None:
+        marker_times = find_marker_times(marker_stream, MARKER_LABEL)
+        if len(marker_times) and marker_times[0] <= time_stamps[-1]:
+            onset = marker_times[0]
+        elif len(marker_times):
+            print(f"{xdf_file_path}: '{MARKER_LABEL}' marker is after the last EEG sample, "
+                  f"using the start of the recording instead.")
+
     cleaned_data = []
     for channel in range(eeg_data.shape[1]):
         channel_data = eeg_data[:, channel]
-        channel_data = np.nan_to_num(channel_data, nan=0.0, posinf=0.0, neginf=0.0)
         channel_data = detrend(channel_data)
         channel_data = bandpass_filter(channel_data, 0.5, 50.0, sampling_rate)
         cleaned_data.append(channel_data)
-    return np.array(cleaned_data), sampling_rate
+    return np.array(cleaned_data), sampling_rate, time_stamps, onset
 
 
 # Compute power spectrum for each channel
@@ -48,23 +76,30 @@ def compute_power_spectrum(data, sampling_rate):
     return power_spectrum, freq_bins
 
 
-# Ensure the pre and post data have the same number of samples
-def trim_to_min_samples(pre_data, post_data):
-    min_samples = min(pre_data.shape[1], post_data.shape[1])
-    pre_data_trimmed = pre_data[:, :min_samples]
-    post_data_trimmed = post_data[:, :min_samples]
-    return pre_data_trimmed, post_data_trimmed
+# Cut equally long windows starting at each recording's onset
+def align_to_onset(pre_data, pre_time_stamps, pre_onset, post_data, post_time_stamps, post_onset):
+    pre_index = find_event_indices(pre_time_stamps, [pre_onset])
+    post_index = find_event_indices(post_time_stamps, [post_onset])
+    window = min(pre_data.shape[1] - pre_index[0], post_data.shape[1] - post_index[0])
+    if window <= 0:
+        raise ValueError("No EEG samples after the onset in one of the recordings.")
+
+    # Epochs are views over (samples, channels), so transpose back without copying
+    pre_epoch = extract_epochs(pre_data.T, pre_index, 0, window)[0].T
+    post_epoch = extract_epochs(post_data.T, post_index, 0, window)[0].T
+    return pre_epoch, post_epoch
 
 
 # Load pre and post music listening data for both participants
 pre_xdf_file_path = '/Users/karthickchandrasekar/Desktop/BlockChainProject/iot/maggie_1.xdf'
 post_xdf_file_path = 'post_music.xdf'
 
-pre_data, sampling_rate = load_and_preprocess(pre_xdf_file_path)
-post_data, _ = load_and_preprocess(post_xdf_file_path)
+pre_data, sampling_rate, pre_time_stamps, pre_onset = load_and_preprocess(pre_xdf_file_path)
+post_data, _, post_time_stamps, post_onset = load_and_preprocess(post_xdf_file_path)
 
-# Trim data to have the same number of samples
-pre_data, post_data = trim_to_min_samples(pre_data, post_data)
+# Align both recordings on their onsets and keep the same number of samples
+pre_data, post_data = align_to_onset(pre_data, pre_time_stamps, pre_onset,
+                                     post_data, post_time_stamps, post_onset)
 
 # Compute power spectra
 pre_power_spectrum, freq_bins = compute_power_spectrum(pre_data, sampling_rate)
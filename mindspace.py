@@ -4,9 +4,14 @@ import numpy as np
 from scipy import signal
 from pylsl import StreamInlet, resolve_stream
 import time
+from streaming import StreamingFilter
 
 # Constants
 RECORD_DURATION = 60  # Duration in seconds
+SAMPLING_RATE = 256  # Muse headband sampling rate
+NOTCH_FREQ = 60.0  # Mains frequency in Hz, use 50.0 where the grid runs at 50 Hz
+CHUNK_SIZE = 32  # Maximum samples per live chunk (125 ms at 256 Hz)
+POLL_INTERVAL = 0.01  # Seconds to wait when no new samples are available
 MUSE_ADDRESS = "170A1E6D-C386-2E20-6012-76E4C5586FD7"  # Replace with your Muse device's MAC address
 
 
@@ -29,15 +34,21 @@ async def connect_to_muse(address):
     return process
 
 
-async def record_eeg(duration):
+async def record_eeg(duration, preprocessor=None, consumers=()):
     """
     Record EEG data from the connected Muse device.
 
+    Samples are pulled in small chunks as soon as they arrive. Each chunk is filtered by
+    the preprocessor, if one is given, and handed to every consumer together with its
+    timestamps. Without a preprocessor the consumers receive the raw chunk.
+
     Args:
     duration (int): Duration of recording in seconds
+    preprocessor (StreamingFilter): Causal filter applied to each chunk, or None
+    consumers (iterable): Callables taking (chunk, timestamps), e.g. writers or live viewers
 
     Returns:
-    list: List of EEG data samples, each sample is a list of channel values and a timestamp
+    list: List of raw EEG data samples, each sample is a list of channel values and a timestamp
     """
     print("Looking for an EEG stream...")
     streams = resolve_stream('type', 'EEG')
@@ -53,8 +64,18 @@ async def record_eeg(duration):
     eeg_data = []
 
     while time.time() - start_time < duration:
-        sample, timestamp = inlet.pull_sample()
-        eeg_data.append(sample + [timestamp])  # Add timestamp to the sample
+        chunk, timestamps = inlet.pull_chunk(timeout=0.0, max_samples=CHUNK_SIZE)
+        if not timestamps:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+
+        for sample, timestamp in zip(chunk, timestamps):
+            eeg_data.append(sample + [timestamp])  # Add timestamp to the sample
+
+        if preprocessor is not None:
+            chunk = preprocessor.process(chunk)
+        for consumer in consumers:
+            consumer(chunk, timestamps)
 
     print("Recording completed.")
     return eeg_data
@@ -82,24 +103,47 @@ def save_to_csv(eeg_data, filename):
     return filename
 
 
-async def record_and_save(filename):
+def collect_chunks(eeg_data):
+    """
+    Create a consumer that appends each chunk to a list in the same layout as record_eeg.
+
+    Args:
+    eeg_data (list): List the samples are appended to
+
+    Returns:
+    function: Consumer taking (chunk, timestamps)
+    """
+    def collect(chunk, timestamps):
+        for sample, timestamp in zip(np.asarray(chunk).tolist(), timestamps):
+            eeg_data.append(sample + [timestamp])
+
+    return collect
+
+
+async def record_and_save(filename, filtered_filename, consumers=()):
     """
-    Connect to Muse, record EEG data, and save it to a file.
+    Connect to Muse, record EEG data, and save the raw and live-filtered data to files.
 
     Args:
-    filename (str): Name of the file to save the recorded data
+    filename (str): Name of the file to save the raw data
+    filtered_filename (str): Name of the file to save the filtered data
+    consumers (iterable): Additional callables that receive each filtered chunk and its timestamps
 
     Returns:
-    str: Name of the saved file, or None if recording or saving failed
+    str: Name of the saved filtered file, or None if recording or saving failed
     """
     muse_process = await connect_to_muse(MUSE_ADDRESS)
     print("Waiting for EEG stream to start...")
     await asyncio.sleep(5)  # Give some time for the stream to start
-    eeg_data = await record_eeg(RECORD_DURATION)
+    preprocessor = StreamingFilter(SAMPLING_RATE, notch_freq=NOTCH_FREQ)
+    filtered_data = []
+    consumers = [collect_chunks(filtered_data), *consumers]
+    eeg_data = await record_eeg(RECORD_DURATION, preprocessor, consumers)
     muse_process.terminate()
     await muse_process.wait()
     if eeg_data:
-        return save_to_csv(eeg_data, filename)
+        save_to_csv(eeg_data, filename)
+        return save_to_csv(filtered_data, filtered_filename)
     else:
         print("Failed to record EEG data.")
         return None
@@ -115,7 +159,7 @@ def calculate_band_powers(eeg_data):
     Returns:
     dict: Power in each frequency band
     """
-    sampling_rate = 256  # Muse headband sampling rate
+    sampling_rate = SAMPLING_RATE
 
     # Define frequency bands
     bands = {
@@ -240,7 +284,7 @@ async def main():
     Main function to run the EEG recording and analysis process.
     """
     print("Recording pre-music EEG data...")
-    pre_music_file = await record_and_save(".venv/pre_music_eeg.csv")
+    pre_music_file = await record_and_save(".venv/pre_music_eeg.csv", ".venv/pre_music_eeg_filtered.csv")
 
     if not pre_music_file:
         print("Failed to record pre-music EEG data. Exiting.")
@@ -249,7 +293,7 @@ async def main():
     input("Press Enter when you're ready to record post-music EEG data...")
 
     print("Recording post-music EEG data...")
-    post_music_file = await record_and_save(".venv/post_music_eeg.csv")
+    post_music_file = await record_and_save(".venv/post_music_eeg.csv", ".venv/post_music_eeg_filtered.csv")
 
     if not post_music_file:
         print("Failed to record post-music EEG data. Exiting.")
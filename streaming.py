@@ -0,0 +1,63 @@
+import numpy as np
+from scipy import signal
+
+
+class StreamingFilter:
+    """
+    Causal band-pass and notch filter for EEG that arrives in chunks.
+
+    The filter state is kept between calls to process, so consecutive chunks are
+    filtered as one continuous signal without edge effects at chunk boundaries.
+    """
+
+    def __init__(self, sampling_rate, lowcut=0.5, highcut=50.0, notch_freq=60.0,
+                 notch_quality=30.0, order=5):
+        """
+        Design the filter and set up its state.
+
+        Args:
+        sampling_rate (float): Sampling rate of the stream in Hz
+        lowcut (float): Lower edge of the pass band in Hz
+        highcut (float): Upper edge of the pass band in Hz
+        notch_freq (float): Mains frequency to remove in Hz, or None to skip the notch
+        notch_quality (float): Quality factor of the notch
+        order (int): Order of the Butterworth band-pass
+        """
+        sos = signal.butter(order, [lowcut, highcut], btype='band', fs=sampling_rate, output='sos')
+        if notch_freq is not None and notch_freq < sampling_rate / 2:
+            b, a = signal.iirnotch(notch_freq, notch_quality, fs=sampling_rate)
+            sos = np.vstack([sos, signal.tf2sos(b, a)])
+
+        self.sos = sos
+        self._zi_unit = signal.sosfilt_zi(sos)[:, :, np.newaxis]
+        self.zi = None
+
+    def reset(self):
+        """
+        Forget the filter state so the next chunk starts a new signal.
+        """
+        self.zi = None
+
+    def process(self, chunk):
+        """
+        Filter one chunk of samples and carry the state over to the next chunk.
+
+        NaN and Inf values are replaced with 0 before filtering so they can't
+        propagate through the filter state.
+
+        Args:
+        chunk (array-like): Samples with shape (n_samples, n_channels)
+
+        Returns:
+        np.ndarray: Filtered samples with the same shape as chunk
+        """
+        chunk = np.nan_to_num(np.asarray(chunk, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+        if chunk.shape[0] == 0:
+            return chunk
+
+        if self.zi is None:
+            # Start from steady state at the first sample to avoid a large onset transient
+            self.zi = self._zi_unit * chunk[0]
+
+        filtered, self.zi = signal.sosfilt(self.sos, chunk, axis=0, zi=self.zi)
+        return filtered
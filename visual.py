@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes
+from alignment import fit_sample_clock
 
 def visualize_eeg(csv_filename):
     # Load the CSV file
@@ -13,8 +14,9 @@ def visualize_eeg(csv_filename):
     channels = ['TP9', 'AF7', 'AF8', 'TP10']
     colors = ['r', 'g', 'b', 'm']  # Red, Green, Blue, Magenta
 
-    # Use the index as the time axis
-    time_axis = data.index / 256  # Assuming 256 Hz sampling rate, convert to seconds
+    # Use the recorded timestamps as the time axis so dropped samples show up as gaps
+    t0, _ = fit_sample_clock(data['Timestamp'].to_numpy())
+    time_axis = data['Timestamp'] - t0
 
     for channel, color in zip(channels, colors):
         plt.plot(time_axis, data[channel], color=color, label=channel, linewidth=0.5)